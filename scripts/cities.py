@@ -1,32 +1,25 @@
 #!/usr/bin/env python
 import csv
 import io
+import os
+import shutil
+import tempfile
 import urllib.request
 import zipfile
 
-def generateCityList():
-    countryInfoUrl = "http://download.geonames.org/export/dump/countryInfo.txt"
-    countryToContinent = {}
-    
-    # Fetch country to continent mapping
-    with urllib.request.urlopen(countryInfoUrl) as response:
-        lines = response.read().decode('utf-8').splitlines()
-        for line in lines:
-            if line.startswith('#') or not line.strip():
-                continue
-            parts = line.split('\t')
-            countryToContinent[parts[0]] = parts[8]
-
+def iterCities(countryToContinent):
+    """Yield [name, country, continent, lat, lon, population] for each city over 100k."""
     citiesUrl = "http://download.geonames.org/export/dump/cities15000.zip"
-    citiesData = []
 
-    # Fetch and parse cities data
-    with urllib.request.urlopen(citiesUrl) as response:
-        with zipfile.ZipFile(io.BytesIO(response.read())) as z:
+    # Fetch and parse cities data. ZipFile needs a seekable file, so spool the
+    # download (to disk once it passes 1 MiB) and stream the member line by line.
+    with urllib.request.urlopen(citiesUrl) as response, tempfile.SpooledTemporaryFile(max_size=1 << 20) as spool:
+        shutil.copyfileobj(response, spool)
+        spool.seek(0)
+        with zipfile.ZipFile(spool) as z:
             with z.open('cities15000.txt') as f:
-                lines = f.read().decode('utf-8').splitlines()
-                for line in lines:
-                    parts = line.split('\t')
+                for line in io.TextIOWrapper(f, encoding='utf-8'):
+                    parts = line.rstrip('\n').split('\t')
                     # Name(1), Lat(4), Lon(5), Country(8), Pop(14)
                     population = int(parts[14])
                     if population > 100000:
@@ -35,12 +28,34 @@ def generateCityList():
                         lat = parts[4]
                         lon = parts[5]
                         continent = countryToContinent.get(country, "Unknown")
-                        citiesData.append([name, country, continent, lat, lon, population])
+                        yield [name, country, continent, lat, lon, population]
+
+def generateCityList():
+    countryInfoUrl = "http://download.geonames.org/export/dump/countryInfo.txt"
+    countryToContinent = {}
+    
+    # Fetch country to continent mapping
+    with urllib.request.urlopen(countryInfoUrl) as response:
+        for line in io.TextIOWrapper(response, encoding='utf-8'):
+            if line.startswith('#') or not line.strip():
+                continue
+            parts = line.split('\t')
+            countryToContinent[parts[0]] = parts[8]
 
-    with open('cities_over_100k.csv', 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['Name', 'Country', 'Continent', 'Latitude', 'Longitude', 'Population'])
-        writer.writerows(citiesData)
+    # Rows are written as they are parsed rather than collected first. They go
+    # to a temporary file that replaces the CSV only once the download and
+    # parse succeed, so a failure leaves the previous CSV untouched.
+    outPath = 'cities_over_100k.csv'
+    tmpPath = outPath + '.tmp'
+    try:
+        with open(tmpPath, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
+            writer = csv.writer(f)
+            writer.writerow(['Name', 'Country', 'Continent', 'Latitude', 'Longitude', 'Population'])
+            writer.writerows(iterCities(countryToContinent))
+        os.replace(tmpPath, outPath)
+    finally:
+        if os.path.exists(tmpPath):
+            os.remove(tmpPath)
 
 if __name__ == '__main__':
     generateCityList()
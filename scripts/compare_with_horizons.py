@@ -7,13 +7,20 @@ Usage: python compare_with_horizons.py <orrery_test_file.txt>
 Reads the test data file written by the app's "Export Test Data" feature,
 queries JPL Horizons for the same time and location, and prints a
 side-by-side comparison with differences.
+
+Horizons responses are cached in ~/.cache/orrery_horizons; delete that
+directory to force fresh queries.
 """
 
 import sys
+import os
 import re
 import urllib.request
 import json
-import time
+import hashlib
+import functools
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 # JPL Horizons body IDs
 BODY_IDS = {
@@ -28,109 +35,143 @@ BODY_IDS = {
     "Neptune": "899",
 }
 
+# Maximum number of Horizons requests in flight at once (be polite to the API)
+HORIZONS_WORKERS = 4
+
+# Successful Horizons responses are cached here, keyed by the query URL
+HORIZONS_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "orrery_horizons")
+
+# Orrery export line patterns, keyed by the text before the first colon so
+# each line needs one dict lookup and at most one regex match.
+# Value: (compiled pattern, keys for the captured groups, cast)
+_HEADER_FIELDS = {
+    "Epoch Day (UT)": (re.compile(r"Epoch Day \(UT\): ([\d.\-]+)"), ("epoch_day",), float),
+    "Julian Date": (re.compile(r"Julian Date: ([\d.]+)"), ("jd",), float),
+    "Latitude": (re.compile(r"Latitude: ([\d.\-]+) deg"), ("lat",), float),
+    "Longitude": (re.compile(r"Longitude: ([\d.\-]+) deg"), ("lon",), float),
+    "GMST": (re.compile(r"GMST: ([\d.]+) hours"), ("gmst",), float),
+    "LST": (re.compile(r"LST: ([\d.]+) hours"), ("lst",), float),
+    "Equation of Time": (re.compile(r"Equation of Time: ([\d.\-]+) minutes"), ("eot",), float),
+    "UT Date/Time": (re.compile(r"UT Date/Time: (.+) UT$"), ("ut_string",), str),
+}
+
+_COMMON_BODY_FIELDS = {
+    "Distance": (re.compile(r"Distance: ([\d.\-]+) AU"), ("dist",), float),
+    "Distance from Earth": (re.compile(r"Distance from Earth: ([\d.\-]+) AU"), ("dist",), float),
+    "Distance from Sun": (re.compile(r"Distance from Sun: ([\d.\-]+) AU"), ("dist_sun",), float),
+    "Ecliptic Lon": (re.compile(r"Ecliptic Lon: ([\d.\-]+) deg\s+Lat: ([\d.\-]+) deg"),
+                     ("ecl_lon", "ecl_lat"), float),
+    "Azimuth": (re.compile(r"Azimuth: ([\d.\-]+) deg\s+Altitude: ([\d.\-]+) deg"),
+                ("az", "alt"), float),
+    "Phase Angle": (re.compile(r"Phase Angle: ([\d.\-]+) deg\s+Illumination: ([\d.\-]+)%"),
+                    ("phase", "illum"), float),
+}
+
+# RA and Dec (use geocentric for Moon, regular for others)
+_MOON_FIELDS = {
+    "RA (geocentric)": (re.compile(r"RA \(geocentric\): ([\d.\-]+) deg"), ("ra",), float),
+    "Dec (geocentric)": (re.compile(r"Dec \(geocentric\): ([\d.\-]+) deg"), ("dec",), float),
+    "RA (topocentric)": (re.compile(r"RA \(topocentric\): ([\d.\-]+) deg"), ("ra_topo",), float),
+    "Dec (topocentric)": (re.compile(r"Dec \(topocentric\): ([\d.\-]+) deg"), ("dec_topo",), float),
+    **_COMMON_BODY_FIELDS,
+}
+
+_BODY_FIELDS = {
+    "RA": (re.compile(r"RA: ([\d.\-]+) deg"), ("ra",), float),
+    "Dec": (re.compile(r"Dec: ([\d.\-]+) deg"), ("dec",), float),
+    **_COMMON_BODY_FIELDS,
+}
+
+_RE_SECTION = re.compile(r"--- (\w+) ---")
+
+# A whole Horizons data token that parses as a float
+_RE_NUMBER = re.compile(r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+
+
+def _match_field(fields, prefix, line, target):
+    """Look up the line's prefix in fields and store any captured values in target."""
+    entry = fields.get(prefix)
+    if entry is None:
+        return
+    pattern, keys, cast = entry
+    m = pattern.match(line)
+    if m:
+        for key, value in zip(keys, m.groups()):
+            target[key] = cast(value)
+
+
 def parse_orrery_file(filename):
     """Parse the Orrery test data export file."""
-    with open(filename, "r") as f:
-        lines = f.readlines()
-
     data = {"bodies": {}}
     current_body = None
 
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
+    with open(filename, "r") as f:
+        for raw in f:
+            line = raw.strip()
+            if not line:
+                continue
+
+            # Header values
+            prefix = line.split(":", 1)[0]
+            _match_field(_HEADER_FIELDS, prefix, line, data)
+
+            # Body sections
+            if line.startswith("---") and (m := _RE_SECTION.match(line)):
+                name = m.group(1)
+                if name == "Jovian":
+                    current_body = None  # Skip Jovian Moons section for Horizons comparison
+                else:
+                    current_body = name
+                    data["bodies"][current_body] = {}
+                continue
+
+            if current_body is None:
+                continue
+
+            body_fields = _MOON_FIELDS if current_body == "Moon" else _BODY_FIELDS
+            _match_field(body_fields, prefix, line, data["bodies"][current_body])
 
-        # Header values
-        m = re.match(r"Epoch Day \(UT\): ([\d.\-]+)", line)
-        if m:
-            data["epoch_day"] = float(m.group(1))
-        m = re.match(r"Julian Date: ([\d.]+)", line)
-        if m:
-            data["jd"] = float(m.group(1))
-        m = re.match(r"Latitude: ([\d.\-]+) deg", line)
-        if m:
-            data["lat"] = float(m.group(1))
-        m = re.match(r"Longitude: ([\d.\-]+) deg", line)
-        if m:
-            data["lon"] = float(m.group(1))
-        m = re.match(r"GMST: ([\d.]+) hours", line)
-        if m:
-            data["gmst"] = float(m.group(1))
-        m = re.match(r"LST: ([\d.]+) hours", line)
-        if m:
-            data["lst"] = float(m.group(1))
-        m = re.match(r"Equation of Time: ([\d.\-]+) minutes", line)
-        if m:
-            data["eot"] = float(m.group(1))
-        m = re.match(r"UT Date/Time: (.+) UT$", line)
-        if m:
-            data["ut_string"] = m.group(1)
-
-        # Body sections
-        m = re.match(r"--- (\w+) ---", line)
-        if m:
-            name = m.group(1)
-            if name == "Jovian":
-                current_body = None  # Skip Jovian Moons section for Horizons comparison
-            else:
-                current_body = name
-                data["bodies"][current_body] = {}
-            continue
+    return data
 
-        if current_body is None:
-            continue
 
-        body = data["bodies"][current_body]
-
-        # RA and Dec (use geocentric for Moon, regular for others)
-        if current_body == "Moon":
-            m = re.match(r"RA \(geocentric\): ([\d.\-]+) deg", line)
-            if m:
-                body["ra"] = float(m.group(1))
-            m = re.match(r"Dec \(geocentric\): ([\d.\-]+) deg", line)
-            if m:
-                body["dec"] = float(m.group(1))
-            m = re.match(r"RA \(topocentric\): ([\d.\-]+) deg", line)
-            if m:
-                body["ra_topo"] = float(m.group(1))
-            m = re.match(r"Dec \(topocentric\): ([\d.\-]+) deg", line)
-            if m:
-                body["dec_topo"] = float(m.group(1))
-        else:
-            m = re.match(r"RA: ([\d.\-]+) deg", line)
-            if m:
-                body["ra"] = float(m.group(1))
-            m = re.match(r"Dec: ([\d.\-]+) deg", line)
-            if m:
-                body["dec"] = float(m.group(1))
-
-        m = re.match(r"Distance: ([\d.\-]+) AU", line)
-        if m:
-            body["dist"] = float(m.group(1))
-        m = re.match(r"Distance from Earth: ([\d.\-]+) AU", line)
-        if m:
-            body["dist"] = float(m.group(1))
-        m = re.match(r"Distance from Sun: ([\d.\-]+) AU", line)
-        if m:
-            body["dist_sun"] = float(m.group(1))
-
-        m = re.match(r"Ecliptic Lon: ([\d.\-]+) deg\s+Lat: ([\d.\-]+) deg", line)
-        if m:
-            body["ecl_lon"] = float(m.group(1))
-            body["ecl_lat"] = float(m.group(2))
-
-        m = re.match(r"Azimuth: ([\d.\-]+) deg\s+Altitude: ([\d.\-]+) deg", line)
-        if m:
-            body["az"] = float(m.group(1))
-            body["alt"] = float(m.group(2))
-
-        m = re.match(r"Phase Angle: ([\d.\-]+) deg\s+Illumination: ([\d.\-]+)%", line)
-        if m:
-            body["phase"] = float(m.group(1))
-            body["illum"] = float(m.group(2))
+def horizons_cache_path(url):
+    """Return the cache file path for a Horizons query URL."""
+    return os.path.join(HORIZONS_CACHE_DIR, hashlib.sha1(url.encode()).hexdigest() + ".json")
 
-    return data
+
+@functools.lru_cache(maxsize=None)
+def fetch_horizons_json(url):
+    """Fetch a Horizons API response, reusing the on-disk cache when present.
+
+    Only responses that contain an ephemeris data block are written to the
+    cache; Horizons reports many failures (no ephemeris for the target, bad
+    date or site) as plain text in "result" without an "error" entry.
+    The file is written to a temporary name and renamed into place so a
+    concurrent or interrupted run never sees a partial file.
+    """
+    cache_path = horizons_cache_path(url)
+    try:
+        with open(cache_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass  # not cached yet, or unreadable; fetch it again
+
+    req = urllib.request.Request(url)
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        result = json.loads(resp.read().decode())
+
+    raw = result.get("result", "")
+    if "error" not in result and "$$SOE" in raw and "$$EOE" in raw:
+        try:
+            os.makedirs(HORIZONS_CACHE_DIR, exist_ok=True)
+            with tempfile.NamedTemporaryFile("w", dir=HORIZONS_CACHE_DIR,
+                                             suffix=".tmp", delete=False) as f:
+                json.dump(result, f)
+            os.replace(f.name, cache_path)
+        except OSError:
+            pass  # caching is best effort; the response is still returned
+
+    return result
 
 
 def query_horizons(body_name, jd, lat, lon):
@@ -138,10 +179,15 @@ def query_horizons(body_name, jd, lat, lon):
 
     Horizons API requires single-quoted values for several parameters.
     These must be URL-encoded as %27 in the query string.
+
+    Returns (horizons_data, messages). horizons_data is None on failure;
+    messages holds diagnostic lines for the caller to print, since queries
+    run on worker threads and printing there would interleave the output.
     """
+    messages = []
     body_id = BODY_IDS.get(body_name)
     if body_id is None:
-        return None
+        return None, messages
 
     # Horizons API expects longitude in 0-360 east-positive format
     horizons_lon = lon % 360.0
@@ -173,16 +219,14 @@ def query_horizons(body_name, jd, lat, lon):
     url = base + params
 
     try:
-        req = urllib.request.Request(url)
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            result = json.loads(resp.read().decode())
+        result = fetch_horizons_json(url)
     except Exception as e:
-        print(f"  ERROR querying Horizons for {body_name}: {e}")
-        return None
+        messages.append(f"  ERROR querying Horizons for {body_name}: {e}")
+        return None, messages
 
     if "error" in result:
-        print(f"  Horizons error for {body_name}: {result['error']}")
-        return None
+        messages.append(f"  Horizons error for {body_name}: {result['error']}")
+        return None, messages
 
     raw = result.get("result", "")
 
@@ -190,22 +234,17 @@ def query_horizons(body_name, jd, lat, lon):
     soe = raw.find("$$SOE")
     eoe = raw.find("$$EOE")
     if soe == -1 or eoe == -1:
-        print(f"  Could not find data block for {body_name}")
-        return None
+        messages.append(f"  Could not find data block for {body_name}")
+        return None, messages
 
     data_block = raw[soe + 5:eoe].strip()
 
     # Data line format (with QUANTITIES='1,2,4,20,31', ANG_FORMAT=DEG):
     #   JD  flags  RA_ICRF  DEC_ICRF  RA_app  DEC_app  Az  Elev  delta  deldot  ObsEcLon  ObsEcLat
     # The flags column contains tokens like "*m", "*", "C" etc. which are non-numeric.
-    # Strategy: collect all tokens, keep only those that parse as float.
-    all_tokens = data_block.split()
-    nums = []
-    for token in all_tokens:
-        try:
-            nums.append(float(token))
-        except ValueError:
-            pass  # skip flag tokens like "*m", "n.a.", etc.
+    # Strategy: collect all tokens, keep only those that look like numbers
+    # (skips flag tokens like "*m", "n.a.", etc. without raising ValueError).
+    nums = [float(token) for token in data_block.split() if _RE_NUMBER.fullmatch(token)]
 
     horizons_data = {}
 
@@ -227,10 +266,10 @@ def query_horizons(body_name, jd, lat, lon):
         horizons_data["ecl_lon"] = vals[8]
         horizons_data["ecl_lat"] = vals[9]
     else:
-        print(f"  Warning: expected 10+ values for {body_name}, got {len(vals)}")
-        print(f"  Data block: {data_block[:200]}")
+        messages.append(f"  Warning: expected 10+ values for {body_name}, got {len(vals)}")
+        messages.append(f"  Data block: {data_block[:200]}")
 
-    return horizons_data
+    return horizons_data, messages
 
 
 def angle_diff(a, b):
@@ -305,6 +344,12 @@ def main():
     if only_body:
         bodies_to_check = [only_body]
 
+    # Queries are network bound, so run them concurrently, then print the
+    # results and any diagnostics in body order
+    with ThreadPoolExecutor(max_workers=HORIZONS_WORKERS) as executor:
+        futures = {name: executor.submit(query_horizons, name, jd, lat, lon)
+                   for name in bodies_to_check if name in data["bodies"]}
+
     for body_name in bodies_to_check:
         orrery_body = data["bodies"].get(body_name)
         if orrery_body is None:
@@ -312,7 +357,9 @@ def main():
             continue
 
         print(f"--- {body_name} ---")
-        hz = query_horizons(body_name, jd, lat, lon)
+        hz, messages = futures[body_name].result()
+        for message in messages:
+            print(message)
         if hz is None:
             print("  Could not get Horizons data")
             print()
@@ -351,9 +398,6 @@ def main():
 
         print()
 
-        # Be polite to the API
-        time.sleep(0.5)
-
     print("Done.")
 
 
@@ -29,7 +29,8 @@ RECORD_SIZE = struct.calcsize(RECORD_FMT)
 assert RECORD_SIZE == 64
 
 count = 0
-with open(CSV_PATH, encoding='utf-8') as fin, open(BIN_PATH, 'wb') as fout:
+# Records are only 64 bytes, so use a large write buffer to batch them
+with open(CSV_PATH, encoding='utf-8') as fin, open(BIN_PATH, 'wb', buffering=1 << 20) as fout:
     reader = csv.reader(fin)
     next(reader)  # skip header
     for row in reader:
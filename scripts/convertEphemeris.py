@@ -1,6 +1,6 @@
 # Converts CSV ephemeris files to binary format
+import numpy as np
 import pandas as pd
-import struct
 import os
 
 # Paths
@@ -15,30 +15,30 @@ def convert_csv_to_bin(filename, output_name, num_data_cols):
     
     print(f"Reading {csv_path}...")
     try:
-        df = pd.read_csv(csv_path)
+        # Header only; the rows are streamed in chunks below
+        columns = pd.read_csv(csv_path, nrows=0).columns
     except FileNotFoundError:
         print(f"Error: Could not find {csv_path}")
         return
 
     # Total columns = 1 (JD) + Data Columns
-    # Validate column count
+    # Validate column count; the app reads fixed-stride records, so a
+    # mismatch would produce a corrupt asset
     expected_cols = 1 + num_data_cols
-    if len(df.columns) != expected_cols:
-        print(f"Warning: Expected {expected_cols} columns, found {len(df.columns)}. Verifying...")
+    if len(columns) != expected_cols:
+        print(f"Error: Expected {expected_cols} columns, found {len(columns)}. Not writing {bin_path}")
+        return
 
     print(f"Writing {bin_path}...")
     
+    count = 0
     with open(bin_path, 'wb') as f:
-        # We write row by row.
-        # Format: Little Endian (<), all Doubles (d)
-        # String format: e.g., "<55d" for planets
-        fmt = f"<{expected_cols}d"
-        
-        count = 0
-        for row in df.itertuples(index=False, name=None):
-            # Pack the entire row (JD + Data) as doubles
-            f.write(struct.pack(fmt, *row))
-            count += 1
+        # Write each chunk in one go, row-major (JD + Data per row).
+        # Format: Little Endian, all Doubles ('<f8')
+        for chunk in pd.read_csv(csv_path, chunksize=65536, dtype='float64'):
+            rows = np.ascontiguousarray(chunk.to_numpy(dtype='<f8'))
+            rows.tofile(f)
+            count += len(rows)
             
     print(f"Success! Wrote {count} rows. Size: {os.path.getsize(bin_path) / 1024:.1f} KB")
 
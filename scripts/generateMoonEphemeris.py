@@ -1,7 +1,11 @@
-`# Fetch Moon ephemeris from JPL Horizonsimport urllib.request
+# Fetch Moon ephemeris from JPL Horizons
+import urllib.request
 import urllib.parse
-import csv
+import io
+import itertools
 import time
+import numpy as np
+import pandas as pd
 
 # --- CONFIGURATION ---
 START_TIME = "2021-01-01"
@@ -9,24 +13,26 @@ STOP_TIME  = "2031-01-01"
 STEP_SIZE  = "1h"
 
 BODIES = [ ('301', 'Moon') ]
+# Output formats: JD, then [RA, Dec, GeoDist, HelioDist, HelioLon, HelioLat] per body
+JD_FMT = '%.9f'
+BODY_FMT = ['%.6f', '%.6f', '%.8f', '%.8f', '%.6f', '%.6f']
 OUTPUT_FILENAME = "ephemeris_moon.csv"
 
-def hms_to_deg(hms_str):
-    try:
-        parts = hms_str.strip().split()
-        if len(parts) != 3: return 0.0
-        h, m, s = float(parts[0]), float(parts[1]), float(parts[2])
-        return (h + m/60 + s/3600) * 15.0
-    except: return 0.0
+# Both converters work on a whole column (Series of strings) at once;
+# unparseable entries become NaN.
+def hms_to_deg(hms):
+    parts = hms.str.split(expand=True).apply(pd.to_numeric, errors='coerce')
+    if parts.shape[1] != 3: return pd.Series(np.nan, index=hms.index)
+    return (parts[0] + parts[1]/60 + parts[2]/3600) * 15.0
 
-def dms_to_deg(dms_str):
-    try:
-        parts = dms_str.strip().split()
-        if len(parts) != 3: return 0.0
-        d, m, s = float(parts[0]), float(parts[1]), float(parts[2])
-        sign = -1 if dms_str.strip().startswith('-') else 1
-        return sign * (abs(d) + m/60 + s/3600)
-    except: return 0.0
+def dms_to_deg(dms):
+    parts = dms.str.split(expand=True).apply(pd.to_numeric, errors='coerce')
+    if parts.shape[1] != 3: return pd.Series(np.nan, index=dms.index)
+    sign = np.where(dms.str.strip().str.startswith('-'), -1.0, 1.0)
+    return sign * (parts[0].abs() + parts[1]/60 + parts[2]/3600)
+
+def to_num(col):
+    return pd.to_numeric(col, errors='coerce')
 
 def fetch_body_data(body_id):
     print(f"Fetching Moon data...")
@@ -39,48 +45,41 @@ def fetch_body_data(body_id):
     }
     url = "https://ssd.jpl.nasa.gov/api/horizons.api?" + urllib.parse.urlencode(params)
     
+    # Stream the response, keeping only the data block between $$SOE and $$EOE
     try:
-        with urllib.request.urlopen(url) as response: content = response.read().decode('utf-8')
-    except Exception as e: print(f"Error: {e}"); return {}
-
-    lines = content.splitlines(); data_lines = []; in_block = False
-    for line in lines:
-        if "$$EOE" in line: in_block = False
-        if in_block: data_lines.append(line)
-        if "$$SOE" in line: in_block = True
+        with urllib.request.urlopen(url) as response:
+            lines = io.TextIOWrapper(response, encoding='utf-8')
+            for line in lines:
+                if "$$SOE" in line: break
+            data_block = ''.join(itertools.takewhile(lambda line: "$$EOE" not in line, lines))
+    except Exception as e: print(f"Error: {e}"); return None
             
-    parsed_data = {} 
-    for row in data_lines:
-        parts = row.split(',')
-        if len(parts) >= 10:
-            try:
-                jd = parts[0].strip(); float(jd)
-                ra = hms_to_deg(parts[3].strip())
-                dec = dms_to_deg(parts[4].strip())
-                h_lon = float(parts[5].strip())
-                h_lat = float(parts[6].strip())
-                h_dist = float(parts[7].strip())
-                g_dist = float(parts[9].strip())
-                
-                parsed_data[jd] = [
-                    f"{ra:.6f}", f"{dec:.6f}", f"{g_dist:.8f}", 
-                    f"{h_dist:.8f}", f"{h_lon:.6f}", f"{h_lat:.6f}"
-                ]
-            except ValueError: continue 
-    return parsed_data
+    if not data_block.strip(): return None
+    rows = pd.read_csv(io.StringIO(data_block), header=None, dtype=str,
+                       skipinitialspace=True)
+    # 0:JD, 1:S, 2:L, 3:RA, 4:Dec, 5:HLon, 6:HLat, 7:HDist, 8:HRate, 9:GDist, 10:GRate
+    if rows.shape[1] < 10: return None
+    
+    # [RA, Dec, GeoDist, HelioDist, HelioLon, HelioLat], indexed by float JD
+    body = pd.DataFrame({
+        "Moon_RA": hms_to_deg(rows[3]), "Moon_Dec": dms_to_deg(rows[4]),
+        "Moon_GeoDist": to_num(rows[9]), "Moon_HelioDist": to_num(rows[7]),
+        "Moon_HelioLon": to_num(rows[5]), "Moon_HelioLat": to_num(rows[6])
+    })
+    body.index = pd.Index(to_num(rows[0]), name="JD")
+    # Drop rows where the JD or any value failed to parse
+    return body[body.index.notna()].dropna()
 
 def main():
     data = fetch_body_data(BODIES[0][0])
-    if not data: return
+    if data is None or data.empty: return
     
-    jds = sorted(data.keys(), key=float)
-    print(f"Writing {len(jds)} rows to {OUTPUT_FILENAME}...")
+    data = data.sort_index()
+    print(f"Writing {len(data)} rows to {OUTPUT_FILENAME}...")
     
-    with open(OUTPUT_FILENAME, 'w', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(["JD", "Moon_RA", "Moon_Dec", "Moon_GeoDist", "Moon_HelioDist", "Moon_HelioLon", "Moon_HelioLat"])
-        for jd in jds:
-            writer.writerow([jd] + data[jd])
+    with open(OUTPUT_FILENAME, 'w', newline='', buffering=1 << 20, encoding='utf-8') as csvfile:
+        np.savetxt(csvfile, data.reset_index().to_numpy(), fmt=[JD_FMT] + BODY_FMT, delimiter=',',
+                   header=','.join(["JD", *data.columns]), comments='')
     print("Done.")
 
 if __name__ == "__main__": main()
@@ -1,8 +1,11 @@
 # Fetch planet ephemeri from JPL Horizons
 import urllib.request
 import urllib.parse
-import csv
-import time
+import io
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
 
 # --- CONFIGURATION ---
 START_TIME = "2021-01-01"
@@ -15,24 +18,28 @@ BODIES = [
     ('599', 'Jupiter'), ('699', 'Saturn'), ('799', 'Uranus'), ('899', 'Neptune'),
     ('90000030', 'Halley')
 ]
+# Output formats: JD, then [RA, Dec, GeoDist, HelioDist, HelioLon, HelioLat] per body
+JD_FMT = '%.9f'
+BODY_FMT = ['%.6f', '%.6f', '%.8f', '%.8f', '%.6f', '%.6f']
 OUTPUT_FILENAME = "ephemeris_planets.csv"
+# Concurrent Horizons requests; kept small to stay under the API's rate limits
+FETCH_WORKERS = 3
 
-def hms_to_deg(hms_str):
-    try:
-        parts = hms_str.strip().split()
-        if len(parts) != 3: return 0.0
-        h, m, s = float(parts[0]), float(parts[1]), float(parts[2])
-        return (h + m/60 + s/3600) * 15.0
-    except: return 0.0
+# Both converters work on a whole column (Series of strings) at once;
+# unparseable entries become NaN.
+def hms_to_deg(hms):
+    parts = hms.str.split(expand=True).apply(pd.to_numeric, errors='coerce')
+    if parts.shape[1] != 3: return pd.Series(np.nan, index=hms.index)
+    return (parts[0] + parts[1]/60 + parts[2]/3600) * 15.0
 
-def dms_to_deg(dms_str):
-    try:
-        parts = dms_str.strip().split()
-        if len(parts) != 3: return 0.0
-        d, m, s = float(parts[0]), float(parts[1]), float(parts[2])
-        sign = -1 if dms_str.strip().startswith('-') else 1
-        return sign * (abs(d) + m/60 + s/3600)
-    except: return 0.0
+def dms_to_deg(dms):
+    parts = dms.str.split(expand=True).apply(pd.to_numeric, errors='coerce')
+    if parts.shape[1] != 3: return pd.Series(np.nan, index=dms.index)
+    sign = np.where(dms.str.strip().str.startswith('-'), -1.0, 1.0)
+    return sign * (parts[0].abs() + parts[1]/60 + parts[2]/3600)
+
+def to_num(col):
+    return pd.to_numeric(col, errors='coerce')
 
 def fetch_body_data(body_id, body_name):
     print(f"Fetching {body_name}...")
@@ -54,89 +61,69 @@ def fetch_body_data(body_id, body_name):
     }
     url = "https://ssd.jpl.nasa.gov/api/horizons.api?" + urllib.parse.urlencode(params)
     
+    # Stream the response, keeping only the data block between $$SOE and $$EOE
     try:
-        with urllib.request.urlopen(url) as response: content = response.read().decode('utf-8')
-    except Exception as e: print(f"Error: {e}"); return {}
-
-    lines = content.splitlines(); data_lines = []; in_block = False
-    for line in lines:
-        if "$$EOE" in line: in_block = False
-        if in_block: data_lines.append(line)
-        if "$$SOE" in line: in_block = True
+        with urllib.request.urlopen(url) as response:
+            lines = io.TextIOWrapper(response, encoding='utf-8')
+            for line in lines:
+                if "$$SOE" in line: break
+            data_block = ''.join(itertools.takewhile(lambda line: "$$EOE" not in line, lines))
+    except Exception as e: print(f"Error: {e}"); return None
             
-    parsed_data = {} 
+    if not data_block.strip(): return None
+    rows = pd.read_csv(io.StringIO(data_block), header=None, dtype=str,
+                       skipinitialspace=True)
     
-    for row in data_lines:
-        parts = row.split(',')
+    # --- PARSING LOGIC DEPENDS ON BODY ---
+    if body_name == 'Sun':
+        # Returned columns for '1,20':
+        # 0:JD, 1:S, 2:L, 3:RA, 4:Dec, 5:GeoDist, 6:Rate
+        if rows.shape[1] < 6: return None
+        g_dist = to_num(rows[5])
         
-        try:
-            jd = parts[0].strip(); float(jd)
-            
-            # --- PARSING LOGIC DEPENDS ON BODY ---
-            if body_name == 'Sun':
-                # Returned columns for '1,20':
-                # 0:JD, 1:S, 2:L, 3:RA, 4:Dec, 5:GeoDist, 6:Rate
-                if len(parts) < 6: continue
-                
-                ra = hms_to_deg(parts[3].strip())
-                dec = dms_to_deg(parts[4].strip())
-                g_dist = float(parts[5].strip())
-                
-                # Hardcode Helio coords for Sun
-                h_dist, h_lon, h_lat = 0.0, 0.0, 0.0
-                
-            else:
-                # Returned columns for '1,18,19,20':
-                # 0:JD, 1:S, 2:L, 3:RA, 4:Dec, 5:HLon, 6:HLat, 7:HDist, 8:HRate, 9:GDist, 10:GRate
-                if len(parts) < 10: continue
-
-                ra = hms_to_deg(parts[3].strip())
-                dec = dms_to_deg(parts[4].strip())
-                h_lon = float(parts[5].strip())
-                h_lat = float(parts[6].strip())
-                h_dist = float(parts[7].strip())
-                g_dist = float(parts[9].strip())
+        # Hardcode Helio coords for Sun
+        h_dist = h_lon = h_lat = pd.Series(0.0, index=rows.index)
+        
+    else:
+        # Returned columns for '1,18,19,20':
+        # 0:JD, 1:S, 2:L, 3:RA, 4:Dec, 5:HLon, 6:HLat, 7:HDist, 8:HRate, 9:GDist, 10:GRate
+        if rows.shape[1] < 10: return None
+        h_lon = to_num(rows[5])
+        h_lat = to_num(rows[6])
+        h_dist = to_num(rows[7])
+        g_dist = to_num(rows[9])
 
-            # UNIFIED OUTPUT FORMAT
-            # [RA, Dec, GeoDist, HelioDist, HelioLon, HelioLat]
-            parsed_data[jd] = [
-                f"{ra:.6f}", f"{dec:.6f}", f"{g_dist:.8f}", 
-                f"{h_dist:.8f}", f"{h_lon:.6f}", f"{h_lat:.6f}"
-            ]
-            
-        except ValueError: continue 
-            
-    return parsed_data
+    # UNIFIED OUTPUT FORMAT, indexed by float JD
+    # [RA, Dec, GeoDist, HelioDist, HelioLon, HelioLat]
+    # Horizons emits identical JD strings for every body, so the index values
+    # match exactly across bodies
+    body = pd.DataFrame({
+        f"{body_name}_RA": hms_to_deg(rows[3]), f"{body_name}_Dec": dms_to_deg(rows[4]),
+        f"{body_name}_GeoDist": g_dist, f"{body_name}_HelioDist": h_dist,
+        f"{body_name}_HelioLon": h_lon, f"{body_name}_HelioLat": h_lat
+    })
+    body.index = pd.Index(to_num(rows[0]), name="JD")
+    # Drop rows where the JD or any value failed to parse
+    return body[body.index.notna()].dropna()
 
 def main():
-    all_data = []
-    for bid, name in BODIES:
-        data = fetch_body_data(bid, name)
-        if not data: 
+    # Fetches are network bound, so run them concurrently; map keeps BODIES order
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        all_data = list(executor.map(lambda body: fetch_body_data(*body), BODIES))
+    for (_, name), data in zip(BODIES, all_data):
+        if data is None or data.empty: 
             print(f"Failed to fetch {name}")
             return
-        all_data.append(data)
-        time.sleep(0.2)
         
-    master_jds = sorted(all_data[0].keys(), key=float)
-    print(f"Merging {len(master_jds)} rows to {OUTPUT_FILENAME}...")
+    # Inner join on JD keeps only the rows every body has
+    merged = pd.concat(all_data, axis=1, join='inner').sort_index()
+    print(f"Merging {len(merged)} rows to {OUTPUT_FILENAME}...")
     
-    with open(OUTPUT_FILENAME, 'w', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        header = ["JD"]
-        for _, name in BODIES: 
-            header.extend([
-                f"{name}_RA", f"{name}_Dec", f"{name}_GeoDist", 
-                f"{name}_HelioDist", f"{name}_HelioLon", f"{name}_HelioLat"
-            ])
-        writer.writerow(header)
-        
-        for jd in master_jds:
-            row = [jd]; valid = True
-            for bd in all_data:
-                if jd in bd: row.extend(bd[jd])
-                else: valid = False; break
-            if valid: writer.writerow(row)
+    # Written with np.savetxt rather than DataFrame.to_csv, which only takes a
+    # single float_format and the distance columns need more decimals
+    with open(OUTPUT_FILENAME, 'w', newline='', buffering=1 << 20, encoding='utf-8') as csvfile:
+        np.savetxt(csvfile, merged.reset_index().to_numpy(), fmt=[JD_FMT] + BODY_FMT * len(BODIES),
+                   delimiter=',', header=','.join(["JD", *merged.columns]), comments='')
     print("Done.")
 
 if __name__ == "__main__": main()
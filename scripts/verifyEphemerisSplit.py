@@ -1,9 +1,10 @@
 # Print coordinates at this time from CSV format ephemeri
-import csv
 import datetime
 import math
 import sys
 
+import numpy as np
+
 # --- CONFIGURATION ---
 MOON_FILE = "ephemeris_moon.csv"
 PLANETS_FILE = "ephemeris_planets.csv"
@@ -62,42 +63,23 @@ def deg_to_dms(deg):
     return f"{sign}{d:02d}:{m:02d}:{s:05.2f}"
 
 def load_file(filename):
-    times = []
-    data_rows = []
     try:
-        with open(filename, 'r') as f:
-            reader = csv.reader(f)
-            next(reader) # Skip header
-            for row in reader:
-                if not row: continue
-                try:
-                    # Parse all cols as floats
-                    vals = [float(x) for x in row]
-                    times.append(vals[0]) # JD is col 0
-                    data_rows.append(vals)
-                except ValueError:
-                    continue
+        # Parse all cols as floats, skipping the header
+        rows = np.loadtxt(filename, delimiter=',', skiprows=1, dtype=np.float64, ndmin=2)
     except FileNotFoundError:
         print(f"[ERROR] Could not find file: {filename}")
         return None, None
-    return times, data_rows
+    return rows[:, 0], rows # JD is col 0
 
-def interpolate(target_jd, times, rows, col_offset):
-    # Binary search for interval
-    # (Linear search OK for script, but let's be robust)
+def interpolate(target_jd, times, rows, ra_cols):
+    # Interpolate every column of rows at target_jd
     if target_jd < times[0] or target_jd > times[-1]:
         return None 
         
-    # Bisect manually
-    low = 0
-    high = len(times) - 1
-    
-    while high - low > 1:
-        mid = (low + high) // 2
-        if times[mid] <= target_jd:
-            low = mid
-        else:
-            high = mid
+    # Binary search for interval: last sample at or before target_jd
+    low = np.searchsorted(times, target_jd, side='right') - 1
+    low = min(low, len(times) - 2)
+    high = low + 1
             
     # Interval found: low..high
     t1 = times[low]
@@ -106,23 +88,19 @@ def interpolate(target_jd, times, rows, col_offset):
     
     row1 = rows[low]
     row2 = rows[high]
+    interp = row1 + (row2 - row1) * frac
     
-    # Extract values: RA (col_offset), Dec (col_offset+1), Dist (col_offset+2)
-    ra1 = row1[col_offset]
-    ra2 = row2[col_offset]
-    
-    # Handle RA wrap (359 -> 1)
-    dRa = ra2 - ra1
-    if dRa < -180: dRa += 360
-    if dRa > 180: dRa -= 360
+    # Handle RA wrap (359 -> 1) in the RA columns
+    ra1 = row1[ra_cols]
+    dRa = row2[ra_cols] - ra1
+    dRa = np.where(dRa < -180, dRa + 360, dRa)
+    dRa = np.where(dRa > 180, dRa - 360, dRa)
     ra = ra1 + dRa * frac
-    if ra < 0: ra += 360
-    if ra >= 360: ra -= 360
+    ra = np.where(ra < 0, ra + 360, ra)
+    ra = np.where(ra >= 360, ra - 360, ra)
+    interp[ra_cols] = ra
     
-    dec = row1[col_offset+1] + (row2[col_offset+1] - row1[col_offset+1]) * frac
-    dist = row1[col_offset+2] + (row2[col_offset+2] - row1[col_offset+2]) * frac
-    
-    return ra, dec, dist
+    return interp
 
 def main():
     print("--- Split Ephemeris Sanity Check ---")
@@ -130,26 +108,24 @@ def main():
     print(f"Current Time (UTC): {datetime.datetime.now(datetime.timezone.utc)}")
     print(f"Current JD:         {now_jd:.6f}\n")
     
-    # Load Data
-    print(f"Loading {MOON_FILE}...")
-    moon_times, moon_rows = load_file(MOON_FILE)
-    if not moon_times: return
-
-    print(f"Loading {PLANETS_FILE}...")
-    planet_times, planet_rows = load_file(PLANETS_FILE)
-    if not planet_times: return
+    # Load Data. All bodies in a file share the same bracketing rows,
+    # so interpolate each file's whole row once.
+    now_rows = {}
+    for filename in (MOON_FILE, PLANETS_FILE):
+        print(f"Loading {filename}...")
+        times, rows = load_file(filename)
+        if times is None or len(times) < 2: return
+        ra_cols = np.array([col for _, f, col in BODIES if f == filename], dtype=np.int64)
+        now_rows[filename] = interpolate(now_jd, times, rows, ra_cols)
     
     print("\n{:<10} | {:<16} | {:<16} | {:<12}".format("Object", "RA (J2000)", "Dec (J2000)", "Dist (AU)"))
     print("-" * 62)
     
     for name, filename, col_idx in BODIES:
-        if filename == MOON_FILE:
-            res = interpolate(now_jd, moon_times, moon_rows, col_idx)
-        else:
-            res = interpolate(now_jd, planet_times, planet_rows, col_idx)
-            
-        if res:
-            ra, dec, dist = res
+        row = now_rows[filename]
+        if row is not None:
+            # RA (col_idx), Dec (col_idx+1), Dist (col_idx+2)
+            ra, dec, dist = row[col_idx], row[col_idx+1], row[col_idx+2]
             print("{:<10} | {} | {} | {:.8f}".format(
                 name, deg_to_hms(ra), deg_to_dms(dec), dist
             ))